@@ -4,25 +4,49 @@ import copy
 import yaml
 import re
 from datetime import datetime
+from .utils import SafeLoader
 
 logger = logging.getLogger(__name__)
 
+# flow-style 字符串值的加引号判定（每个节点的每个字段都会用到，预先编译）
+_FLOW_QUOTE_RE = re.compile(r'[:\{\}\[\],&*|>!%]|^#')
+_SCI_NOTATION_RE = re.compile(r'^[0-9]+[eE][0-9]+$')
+_YAML_RESERVED_WORDS = frozenset(('true', 'false', 'null', 'yes', 'no', 'on', 'off'))
+
 class ClashConfigGenerator:
     """Clash配置生成器（基于模板）"""
 
-    def __init__(self, template_path: str):
+    def __init__(self, template_path: str = None, template_dict: dict = None):
+        """
+        Args:
+            template_path (str): 模板文件路径
+            template_dict (dict): 已解析的模板内容，提供时直接深拷贝使用，不再读取 template_path
+
+        Raises:
+            ValueError: template_path 与 template_dict 均未提供
+        """
+        if template_path is None and template_dict is None:
+            raise ValueError("必须提供 template_path 或 template_dict 之一")
         self.template_path = template_path
-        self.config = self._load_template(template_path)
+        if template_dict is not None:
+            self.config = copy.deepcopy(self._validate_template(template_dict, template_path or '<template_dict>'))
+            logger.info("从已解析的模板内容加载配置")
+        else:
+            self.config = self._load_template(template_path)
+            logger.info(f"从模板 {template_path} 加载配置")
         self.port_mappings = {}
-        logger.info(f"从模板 {template_path} 加载配置")
 
     def _load_template(self, template_path: str) -> dict:
-        if not os.path.exists(template_path):
+        try:
+            with open(template_path, 'r', encoding='utf-8') as f:
+                template = yaml.load(f, Loader=SafeLoader)
+        except FileNotFoundError:
             logger.error(f"模板文件未找到: {template_path}")
             raise FileNotFoundError(f"模板文件未找到: {template_path}")
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template = yaml.safe_load(f)
-        
+
+        return self._validate_template(template, template_path)
+
+    def _validate_template(self, template, template_path: str) -> dict:
         if not isinstance(template, dict):
             logger.error(f"模板文件 '{template_path}' 格式错误: 根级别必须是字典 (dictionary/map)，而不是列表 (list) 或空文件。")
             raise TypeError(f"模板文件 '{template_path}' 格式错误: 根级别必须是字典。")
@@ -114,9 +138,9 @@ class ClashConfigGenerator:
                 # - IP地址、UUID、emoji等在flow-style的值位置都是安全的,不需要加引号
 
                 needs_quotes = (
-                    bool(re.search(r'[:\{\}\[\],&*|>!%]|^#', data)) or
-                    data in ('true', 'false', 'null', 'yes', 'no', 'on', 'off') or
-                    bool(re.match(r'^[0-9]+[eE][0-9]+$', data))  # 科学计数法格式
+                    _FLOW_QUOTE_RE.search(data) is not None or
+                    data in _YAML_RESERVED_WORDS or
+                    _SCI_NOTATION_RE.match(data) is not None  # 科学计数法格式
                 )
                 if needs_quotes:
                     escaped_data = data.replace("'", "''")
@@ -205,13 +229,15 @@ class ClashConfigGenerator:
         return "\n".join(part for part in final_yaml_parts if part)
 
     def save_config(self, file_path: str) -> bool:
-        yaml_str = self.generate_full_config()
+        # 预先编码后以二进制一次写入，绕过文本层的逐块编码与换行转换
+        data = self.generate_full_config().encode('utf-8')
         dir_path = os.path.dirname(file_path)
-        if dir_path and not os.path.exists(dir_path):
-            os.makedirs(dir_path)
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(yaml_str)
+            if dir_path:
+                # exist_ok 省去单独的存在性检查，目录创建失败时同样返回 False
+                os.makedirs(dir_path, exist_ok=True)
+            with open(file_path, 'wb') as f:
+                f.write(data)
             logger.info(f"配置已成功保存到: {file_path}")
             return True
         except IOError as e:
@@ -26,18 +26,18 @@ def validate_reality_public_key(public_key):
 
     # 检查长度（通常为 43 或 44 字符）
     if len(public_key) < 40 or len(public_key) > 50:
-        logger.debug(f"REALITY public-key 长度异常: {len(public_key)} 字符")
+        logger.debug("REALITY public-key 长度异常: %d 字符", len(public_key))
         return False
 
     # 检查是否只包含有效的Base64 字符
     if not re.match(r'^[A-Za-z0-9+/\-_]+={0,2}$', public_key):
-        logger.debug(f"REALITY public-key 包含无效字符")
+        logger.debug("REALITY public-key 包含无效字符")
         return False
 
     # 排除以纯数字开头的 public-key（容易被误解析为 short-id）
     # 例如: 0Ykahutes0212... 中的 "0" 开头可能导致 Clash 误将其解析为包含 short-id
     if re.match(r'^[0-9]', public_key):
-        logger.warning(f"REALITY public-key 以数字开头，可能导致 Clash 解析错误: {public_key[:20]}...")
+        logger.warning("REALITY public-key 以数字开头，可能导致 Clash 解析错误: %s...", public_key[:20])
         return False
 
     return True
@@ -60,13 +60,13 @@ def validate_reality_short_id(short_id):
 
     # short-id 必须是有效的十六进制字符串，长度 2-16 字符
     if not re.match(r'^[0-9a-fA-F]{2,16}$', short_id_str):
-        logger.warning(f"REALITY short-id 格式无效: {short_id_str}")
+        logger.warning("REALITY short-id 格式无效: %s", short_id_str)
         return False
 
     # 检查是否可能被 YAML 误解析为科学计数法（如 2e81, 3e10 等）
     # 这些值在 YAML 中会被解析为浮点数
     if re.match(r'^[0-9]+[eE][0-9]+$', short_id_str):
-        logger.warning(f"REALITY short-id 可能被 YAML 误解析为科学计数法: {short_id_str}")
+        logger.warning("REALITY short-id 可能被 YAML 误解析为科学计数法: %s", short_id_str)
         return False
 
     return True
@@ -92,13 +92,13 @@ def validate_reality_node(proxy):
     # 验证 public-key
     public_key = reality_opts.get('public-key')
     if not validate_reality_public_key(public_key):
-        logger.warning(f"REALITY 节点 '{proxy.get('name', 'unknown')}' 的 public-key 无效")
+        logger.warning("REALITY 节点 '%s' 的 public-key 无效", proxy.get('name', 'unknown'))
         return False
 
     # 验证 short-id
     short_id = reality_opts.get('short-id')
     if not validate_reality_short_id(short_id):
-        logger.warning(f"REALITY 节点 '{proxy.get('name', 'unknown')}' 的 short-id 无效")
+        logger.warning("REALITY 节点 '%s' 的 short-id 无效", proxy.get('name', 'unknown'))
         return False
 
     return True
@@ -124,10 +124,10 @@ def filter_invalid_reality_nodes(proxies):
             valid_proxies.append(proxy)
         else:
             filtered_count += 1
-            logger.info(f"已过滤无效 REALITY 节点: {proxy.get('name', 'unknown')}")
+            logger.info("已过滤无效 REALITY 节点: %s", proxy.get('name', 'unknown'))
 
     if filtered_count > 0:
-        logger.warning(f"共过滤 {filtered_count} 个无效 REALITY 节点")
+        logger.warning("共过滤 %d 个无效 REALITY 节点", filtered_count)
 
     return valid_proxies
 
@@ -169,7 +169,7 @@ def decode_base64(encoded_str):
             return decoded_bytes.decode('latin1', errors='replace')
             
     except Exception as e:
-        logger.debug(f"Base64解码失败: {str(e)}")
+        logger.debug("Base64解码失败: %s", e)
         return None
 
 def parse_uri(uri):
@@ -187,10 +187,10 @@ def parse_uri(uri):
             payload = match.group(2)
             return scheme, payload
         else:
-            logger.warning(f"无法解析URI: {uri[:30]}...")
+            logger.warning("无法解析URI: %.30s...", uri)
             return None, None
     except Exception as e:
-        logger.error(f"解析URI时发生异常: {str(e)}")
+        logger.error("解析URI时发生异常: %s", e)
         return None, None
 
 class NodeParser:
@@ -213,7 +213,7 @@ class NodeParser:
             name = unquote(parsed_url.fragment) if parsed_url.fragment else f"vless-{server}"
 
             if not all([uuid, server, port]):
-                logger.error(f"VLESS URI missing essential parts: {vless_uri}")
+                logger.error("VLESS URI missing essential parts: %s", vless_uri)
                 return None
 
             params = parse_qs(parsed_url.query)
@@ -253,13 +253,13 @@ class NodeParser:
                 short_id = params.get('sid', [None])[0]
 
                 if not public_key:
-                    logger.error(f"VLESS REALITY node missing public key (pbk): {vless_uri}")
+                    logger.error("VLESS REALITY node missing public key (pbk): %s", vless_uri)
                     return None
 
                 # 验证 public-key 格式，过滤掉可能导致 Clash 解析错误的节点
                 if not validate_reality_public_key(public_key):
-                    logger.warning(f"VLESS REALITY 节点的 public-key 格式无效，已跳过: {name}")
-                    logger.debug(f"无效的 public-key: {public_key}")
+                    logger.warning("VLESS REALITY 节点的 public-key 格式无效，已跳过: %s", name)
+                    logger.debug("无效的 public-key: %s", public_key)
                     return None
 
                 clash_config['reality-opts'] = {
@@ -291,7 +291,7 @@ class NodeParser:
             return clash_config
 
         except Exception as e:
-            logger.error(f"Failed to parse VLESS URI: {vless_uri} - {str(e)}")
+            logger.error("Failed to parse VLESS URI: %s - %s", vless_uri, e)
             return None
     
     def parse_vmess(self, vmess_uri):
@@ -319,7 +319,7 @@ class NodeParser:
             # 必要字段验证
             required_fields = ['add', 'port', 'id', 'aid', 'net']
             if not all(field in vmess_config for field in required_fields):
-                logger.error(f"Vmess配置缺少必要字段: {vmess_config}")
+                logger.error("Vmess配置缺少必要字段: %s", vmess_config)
                 return None
             
             # 转换为Clash格式
@@ -340,7 +340,7 @@ class NodeParser:
                 try:
                     clash_config['name'] = unquote(clash_config['name'])
                 except Exception as e:
-                    logger.warning(f"URL解码VMess节点名称失败: {str(e)}")
+                    logger.warning("URL解码VMess节点名称失败: %s", e)
             
             # 处理TLS
             if vmess_config.get('tls') == 'tls':
@@ -363,7 +363,7 @@ class NodeParser:
             return clash_config
             
         except Exception as e:
-            logger.error(f"解析Vmess失败: {str(e)}")
+            logger.error("解析Vmess失败: %s", e)
             return None
     
     def parse_ss(self, ss_uri):
@@ -419,11 +419,11 @@ class NodeParser:
                      server, port_str = server_part.split(':', 1)
                      port = int(port_str)
                 else:
-                    logger.error(f"无法解析SS认证信息: {ss_uri}")
+                    logger.error("无法解析SS认证信息: %s", ss_uri)
                     return None
 
             if not all([server, port, method, password is not None]):
-                 logger.error(f"SS URI缺少必要部分: {ss_uri}")
+                 logger.error("SS URI缺少必要部分: %s", ss_uri)
                  return None
 
             # 解析查询参数
@@ -490,12 +490,12 @@ class NodeParser:
                 try:
                     clash_config['name'] = unquote(clash_config['name'])
                 except Exception as e:
-                    logger.warning(f"URL解码SS节点名称失败: {str(e)}")
+                    logger.warning("URL解码SS节点名称失败: %s", e)
             
             return clash_config
             
         except Exception as e:
-            logger.error(f"解析SS失败: {str(e)}")
+            logger.error("解析SS失败: %s", e)
             return None
     
     def parse_trojan(self, trojan_uri):
@@ -518,7 +518,7 @@ class NodeParser:
             params = parse_qs(parsed_url.query)
 
             if not all([password, server, port]):
-                logger.error(f"Trojan URI 缺少必要部分: {trojan_uri}")
+                logger.error("Trojan URI 缺少必要部分: %s", trojan_uri)
                 return None
 
             # 构建Clash配置
@@ -543,7 +543,7 @@ class NodeParser:
             return clash_config
             
         except Exception as e:
-            logger.error(f"解析Trojan失败: {str(e)}")
+            logger.error("解析Trojan失败: %s", e)
             return None
     
     def parse_hysteria(self, hysteria_uri):
@@ -612,12 +612,12 @@ class NodeParser:
                 try:
                     clash_config['name'] = unquote(clash_config['name'])
                 except Exception as e:
-                    logger.warning(f"URL解码Hysteria节点名称失败: {str(e)}")
+                    logger.warning("URL解码Hysteria节点名称失败: %s", e)
             
             return clash_config
             
         except Exception as e:
-            logger.error(f"解析Hysteria失败: {str(e)}")
+            logger.error("解析Hysteria失败: %s", e)
             return None
     
     def parse_hysteria2(self, hysteria_uri):
@@ -674,7 +674,7 @@ class NodeParser:
                     port = int(server_port.split(':')[1]) if ':' in server_port else 443
                     password = credentials
                 except Exception as e:
-                    logger.warning(f"解析Hysteria2密码部分时出错: {str(e)}")
+                    logger.warning("解析Hysteria2密码部分时出错: %s", e)
                     password = ""
             else:
                 port = url_parts.port or 443
@@ -744,7 +744,7 @@ class NodeParser:
                 try:
                     clash_config['name'] = unquote(clash_config['name'])
                 except Exception as e:
-                    logger.warning(f"URL解码Hysteria2节点名称失败: {str(e)}")
+                    logger.warning("URL解码Hysteria2节点名称失败: %s", e)
             
             # 添加可选配置
             if mport:
@@ -757,7 +757,7 @@ class NodeParser:
             return clash_config
             
         except Exception as e:
-            logger.error(f"解析Hysteria2失败: {str(e)}")
+            logger.error("解析Hysteria2失败: %s", e)
             return None
     
     def parse_direct_node(self, node_str):
@@ -789,7 +789,7 @@ class NodeParser:
                 elif protocol == 'hysteria2':
                     return self.parse_hysteria2(node_str)
                 else:
-                    logger.warning(f"不支持的协议: {protocol}")
+                    logger.warning("不支持的协议: %s", protocol)
                     return None
             
             # 尝试作为JSON字符串解析
@@ -809,11 +809,11 @@ class NodeParser:
                     logger.warning("无效的JSON字符串")
                     return None
             
-            logger.warning(f"无法识别的节点格式: {node_str[:30]}...")
+            logger.warning("无法识别的节点格式: %.30s...", node_str)
             return None
             
         except Exception as e:
-            logger.error(f"解析节点失败: {str(e)}")
+            logger.error("解析节点失败: %s", e)
             return None
     
     def validate_node(self, node):
@@ -880,7 +880,7 @@ def parse_proxy(uri):
         elif scheme == 'hysteria2':
             proxy = node_parser.parse_hysteria2(uri)
         else:
-            logger.warning(f"不支持的协议类型: {scheme}")
+            logger.warning("不支持的协议类型: %s", scheme)
             return None
         
         # 确保节点名称使用UTF-8编码，避免乱码
@@ -896,16 +896,16 @@ def parse_proxy(uri):
             except UnicodeError:
                 # 如果有编码问题，替换为安全名称
                 proxy['name'] = f"{proxy['type']}-{proxy['server']}"
-                logger.warning(f"节点名称编码有问题，已自动替换: {proxy['name']}")
+                logger.warning("节点名称编码有问题，已自动替换: %s", proxy['name'])
         
         # 验证代理配置
         if proxy and node_parser.validate_node(proxy):
             return proxy
         else:
-            logger.warning(f"代理配置验证失败: {uri[:30]}...")
+            logger.warning("代理配置验证失败: %.30s...", uri)
             return None
     
     except Exception as e:
-        logger.error(f"解析代理URI时发生异常: {str(e)}")
+        logger.error("解析代理URI时发生异常: %s", e)
         return None
 
@@ -6,11 +6,17 @@ import logging
 import random
 import time
 from urllib.parse import unquote
-from .utils import decode_base64, is_base64
+from .utils import decode_base64, is_base64, SafeLoader
 from .node_parser import NodeParser
 
 logger = logging.getLogger(__name__)
 
+# 按行解析时可识别的节点协议前缀
+_NODE_PREFIXES = (
+    'vmess://', 'ss://', 'trojan://', 'ssr://', 'hysteria://',
+    'hysteria2://', 'http://', 'https://', 'vless://',
+)
+
 class SubscriptionManager:
     """订阅管理器，用于获取和解析订阅源"""
     
@@ -36,7 +42,7 @@ class SubscriptionManager:
         Returns:
             str: 订阅内容，获取失败则返回None
         """
-        logger.info(f"开始获取订阅: {url}")
+        logger.info("开始获取订阅: %s", url)
         
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -49,29 +55,29 @@ class SubscriptionManager:
                 # 添加随机延迟，避免被服务器认为是爬虫
                 if retry_count > 0:
                     delay = random.uniform(1, 3)
-                    logger.info(f"等待 {delay:.2f} 秒后重试...")
+                    logger.info("等待 %.2f 秒后重试...", delay)
                     time.sleep(delay)
                 
-                logger.info(f"正在请求订阅 {url} (尝试 {retry_count + 1}/{self.max_retries})")
+                logger.info("正在请求订阅 %s (尝试 %d/%d)", url, retry_count + 1, self.max_retries)
                 response = requests.get(url, headers=headers, timeout=self.timeout)
                 
                 if response.status_code == 200:
                     # 强制使用UTF-8解码,避免requests自动编码检测错误导致乱码
                     content = response.content.decode('utf-8', errors='replace')
-                    logger.info(f"成功获取订阅，内容长度: {len(content)} 字节")
+                    logger.info("成功获取订阅，内容长度: %d 字节", len(content))
                     return content
                 else:
-                    logger.warning(f"获取订阅失败，状态码: {response.status_code}")
+                    logger.warning("获取订阅失败，状态码: %s", response.status_code)
             except requests.exceptions.Timeout:
-                logger.warning(f"请求超时 (已尝试 {retry_count + 1}/{self.max_retries})")
+                logger.warning("请求超时 (已尝试 %d/%d)", retry_count + 1, self.max_retries)
             except requests.exceptions.ConnectionError:
-                logger.warning(f"连接错误 (已尝试 {retry_count + 1}/{self.max_retries})")
+                logger.warning("连接错误 (已尝试 %d/%d)", retry_count + 1, self.max_retries)
             except requests.exceptions.RequestException as e:
-                logger.warning(f"请求异常: {str(e)} (已尝试 {retry_count + 1}/{self.max_retries})")
+                logger.warning("请求异常: %s (已尝试 %d/%d)", e, retry_count + 1, self.max_retries)
             
             retry_count += 1
         
-        logger.error(f"获取订阅失败，已达到最大重试次数 ({self.max_retries})")
+        logger.error("获取订阅失败，已达到最大重试次数 (%d)", self.max_retries)
         return None
 
     def _sanitize_content(self, content):
@@ -118,10 +124,10 @@ class SubscriptionManager:
             cleaned = ''.join(char for char in content if should_keep_char(char))
             removed_count = len(content) - len(cleaned)
             if removed_count > 0:
-                logger.info(f"清理了 {removed_count} 个特殊Unicode字符")
+                logger.info("清理了 %d 个特殊Unicode字符", removed_count)
             return cleaned
         except Exception as e:
-            logger.warning(f"清理内容时出错: {str(e)}, 使用原始内容")
+            logger.warning("清理内容时出错: %s, 使用原始内容", e)
             return content
 
     def parse_subscription(self, content):
@@ -134,7 +140,7 @@ class SubscriptionManager:
         Returns:
             list: 解析后的节点列表
         """
-        logger.info(f"开始解析订阅内容，长度: {len(content)}")
+        logger.info("开始解析订阅内容，长度: %d", len(content))
 
         # 清理可能导致YAML解析失败的特殊Unicode字符
         # 包括:变体选择器、零宽字符、其他控制字符等
@@ -149,7 +155,7 @@ class SubscriptionManager:
                     logger.info("检测到JSON格式，尝试解析")
                     data = json.loads(content)
                     if 'proxies' in data:
-                        logger.info(f"从JSON中找到 {len(data['proxies'])} 个节点")
+                        logger.info("从JSON中找到 %d 个节点", len(data['proxies']))
                         proxies = data['proxies']
                         # 对节点的name字段做处理，确保唯一性
                         self._ensure_unique_names(proxies)
@@ -160,9 +166,9 @@ class SubscriptionManager:
                     # YAML格式
                     logger.info("检测到YAML格式，尝试解析")
                     try:
-                        data = yaml.safe_load(content)
+                        data = yaml.load(content, Loader=SafeLoader)
                         if 'proxies' in data and isinstance(data['proxies'], list):
-                            logger.info(f"从YAML中找到 {len(data['proxies'])} 个节点")
+                            logger.info("从YAML中找到 %d 个节点", len(data['proxies']))
                             proxies = data['proxies']
                             # 对节点的name字段做处理，确保唯一性
                             self._ensure_unique_names(proxies)
@@ -170,10 +176,10 @@ class SubscriptionManager:
                         
                         logger.warning("YAML中未找到有效的proxies字段，尝试其他解析方法")
                     except Exception as e:
-                        logger.warning(f"YAML解析失败: {str(e)}")
+                        logger.warning("YAML解析失败: %s", e)
                 
             except Exception as e:
-                logger.warning(f"解析YAML/JSON时出错: {str(e)}")
+                logger.warning("解析YAML/JSON时出错: %s", e)
         
         # 检测是否是base64编码
         if is_base64(content):
@@ -182,7 +188,7 @@ class SubscriptionManager:
                 decoded = decode_base64(content)
                 return self._parse_decoded_content(decoded)
             except Exception as e:
-                logger.warning(f"BASE64解码失败: {str(e)}")
+                logger.warning("BASE64解码失败: %s", e)
         
         # 未识别到特定格式，尝试按行解析
         return self._parse_raw_content(content)
@@ -290,7 +296,7 @@ class SubscriptionManager:
                     logger.info("解析为JSON格式，提取proxies")
                     return json_data['proxies']
             except Exception as e:
-                logger.warning(f"JSON解析失败: {str(e)}")
+                logger.warning("JSON解析失败: %s", e)
         
         # 否则就按行解析
         return self._parse_raw_content(content)
@@ -311,37 +317,29 @@ class SubscriptionManager:
         proxies = []
         # 按行分割
         lines = content.split('\n')
-        logger.info(f"尝试按行解析内容，共 {len(lines)} 行")
-        
-        # 过滤掉空行和注释行
-        valid_lines = [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
-        logger.info(f"过滤后剩余 {len(valid_lines)} 行有效内容")
-        
+        logger.info("尝试按行解析内容，共 %d 行", len(lines))
+
+        # 过滤掉空行和注释行（每行只 strip 一次）
+        valid_lines = [s for line in lines if (s := line.strip()) and not s.startswith('#')]
+        logger.info("过滤后剩余 %d 行有效内容", len(valid_lines))
+
         # 逐行解析
         parsed_count = 0
         for line in valid_lines:
             try:
                 # 跳过明显不是节点的行
-                if not (line.startswith('vmess://') or 
-                        line.startswith('ss://') or 
-                        line.startswith('trojan://') or 
-                        line.startswith('ssr://') or
-                        line.startswith('hysteria://') or
-                        line.startswith('hysteria2://') or
-                        line.startswith('http://') or 
-                        line.startswith('https://') or
-                        line.startswith('vless://')):
+                if not line.startswith(_NODE_PREFIXES):
                     continue
                 
                 proxy = self.node_parser.parse_direct_node(line)
                 if proxy:
                     proxies.append(proxy)
                     parsed_count += 1
-                    logger.debug(f"成功解析节点: {proxy.get('name', 'unnamed')}")
+                    logger.debug("成功解析节点: %s", proxy.get('name', 'unnamed'))
             except Exception as e:
-                logger.warning(f"解析行出错: {str(e)}, 行内容: {line[:30]}...")
+                logger.warning("解析行出错: %s, 行内容: %.30s...", e, line)
         
-        logger.info(f"按行解析完成，成功解析 {parsed_count} 个节点")
+        logger.info("按行解析完成，成功解析 %d 个节点", parsed_count)
 
         # 对节点的name字段做处理，确保唯一性
         if proxies:
@@ -373,9 +371,9 @@ class SubscriptionManager:
                     if '%' in original_name:
                         try:
                             original_name = unquote(original_name)
-                            logger.debug(f"URL解码名称: {proxy.get('name', '')} -> {original_name}")
+                            logger.debug("URL解码名称: %s -> %s", proxy.get('name', ''), original_name)
                         except Exception as e:
-                            logger.warning(f"URL解码名称失败: {str(e)}")
+                            logger.warning("URL解码名称失败: %s", e)
                     
                     # 测试是否可以编码为UTF-8
                     original_name.encode('utf-8')
@@ -384,7 +382,7 @@ class SubscriptionManager:
                 server = proxy.get('server', 'unknown')
                 proxy_type = proxy.get('type', 'node')
                 original_name = f"{proxy_type}-{server}-{random.randint(1000, 9999)}"
-                logger.warning(f"节点名称编码有问题，已自动替换: {original_name}")
+                logger.warning("节点名称编码有问题，已自动替换: %s", original_name)
             
             # 如果名称为空，生成一个默认名称
             if not original_name:
@@ -402,7 +400,7 @@ class SubscriptionManager:
             proxy['name'] = name
             used_names.add(name)
         
-        logger.info(f"完成节点名称唯一性处理，共 {len(proxies)} 个节点")
+        logger.info("完成节点名称唯一性处理，共 %d 个节点", len(proxies))
     
     def get_proxies_from_url(self, url):
         """
@@ -426,28 +424,28 @@ class SubscriptionManager:
         Returns:
             list: 解析出的节点列表
         """
-        logger.info(f"开始获取并解析订阅: {url}")
+        logger.info("开始获取并解析订阅: %s", url)
         
         # 获取订阅内容
         content = self.fetch_subscription(url)
         if not content:
-            logger.error(f"获取订阅内容失败: {url}")
+            logger.error("获取订阅内容失败: %s", url)
             return []
         
-        logger.info(f"成功获取订阅内容，长度: {len(content)}")
+        logger.info("成功获取订阅内容，长度: %d", len(content))
         content_preview = content[:100].replace('\n', ' ')
-        logger.info(f"订阅内容开头片段: {content_preview}...")
+        logger.info("订阅内容开头片段: %s...", content_preview)
         
         # 解析订阅
         proxies = self.parse_subscription(content)
         if not proxies:
-            logger.error(f"解析订阅失败，未找到有效节点: {url}")
+            logger.error("解析订阅失败，未找到有效节点: %s", url)
             return []
         
-        logger.info(f"成功解析订阅，找到 {len(proxies)} 个节点")
+        logger.info("成功解析订阅，找到 %d 个节点", len(proxies))
         # 打印部分节点名称作为示例
         node_samples = [proxy.get('name', 'unnamed') for proxy in proxies[:min(5, len(proxies))]]
-        logger.info(f"节点示例: {', '.join(node_samples)}{' 等...' if len(proxies) > 5 else ''}")
+        logger.info("节点示例: %s%s", ', '.join(node_samples), ' 等...' if len(proxies) > 5 else '')
         
         # 为每个代理节点添加来源信息
         for proxy in proxies:
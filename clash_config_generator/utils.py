@@ -6,6 +6,13 @@ from urllib.parse import urlparse, parse_qs
 
 logger = logging.getLogger(__name__)
 
+# 加载时优先使用基于 libyaml 的 C 实现，未编译 libyaml 时回退到纯 Python 实现
+# 输出仍使用 PyYAML 自带的 Dumper: libyaml 的 emitter 会把 emoji 等非 BMP 字符转义为 \U 序列
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 
 def is_base64(s: str) -> bool:
     """
@@ -44,7 +51,7 @@ def safe_load_yaml(file_path):
     """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=SafeLoader)
     except Exception as e:
         logger.error(f"YAML文件加载失败: {file_path}, 错误: {e}")
         return None
@@ -62,7 +69,7 @@ def decode_base64(encoded_str: str) -> str:
         decoded_bytes = base64.urlsafe_b64decode(encoded_str)
         return decoded_bytes.decode('utf-8')
     except (base64.binascii.Error, UnicodeDecodeError) as e:
-        logger.error(f"Base64解码失败: {encoded_str}, 错误: {e}")
+        logger.error("Base64解码失败: %s, 错误: %s", encoded_str, e)
         return ""
 
 def parse_uri(uri: str) -> dict:
@@ -81,7 +88,7 @@ def parse_uri(uri: str) -> dict:
             "params": params
         }
     except Exception as e:
-        logger.error(f"URI解析失败: {uri}, 错误: {e}")
+        logger.error("URI解析失败: %s, 错误: %s", uri, e)
         return {}
 
 def load_local_file(file_path: str) -> str:
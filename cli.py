@@ -6,14 +6,20 @@ import logging
 import os
 import sys
 import glob
+import itertools
 from datetime import datetime, timezone, timedelta
-from clash_config_generator.config_generator import ClashConfigGenerator
-from clash_config_generator.subscription import SubscriptionManager
 
 # 设置日志格式
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("clash_config_generator_cli")
 
+# 东八区(北京时间)及默认输出文件名格式
+BEIJING = timezone(timedelta(hours=8))
+_DEFAULT_OUTPUT_FMT = "config_%Y%m%d_%H%M%S.yaml"
+
+# 订阅链接允许的协议前缀
+_HTTP = ('http://', 'https://')
+
 
 # ==================== 交互式辅助函数 ====================
 
@@ -132,7 +138,7 @@ def interactive_input_subscriptions():
                         url = input(f"  订阅 {line_num}: ").strip()
                         if not url:
                             break
-                        if url.startswith('http://') or url.startswith('https://'):
+                        if url.startswith(_HTTP):
                             subscriptions.append(url)
                             line_num += 1
                         else:
@@ -148,13 +154,10 @@ def interactive_input_subscriptions():
             elif choice == '2':
                 # 从文件读取
                 file_path = input("请输入订阅文件路径: ").strip()
-                if not os.path.exists(file_path):
-                    print(f"❌ 文件不存在: {file_path}")
-                    continue
 
                 try:
                     with open(file_path, 'r', encoding='utf-8') as f:
-                        subscriptions = [line.strip() for line in f if line.strip() and line.strip().startswith('http')]
+                        subscriptions = [s for line in f if (s := line.strip()) and s.startswith(_HTTP)]
 
                     if subscriptions:
                         print(f"✅ 从文件读取了 {len(subscriptions)} 个订阅链接")
@@ -162,6 +165,9 @@ def interactive_input_subscriptions():
                     else:
                         print("❌ 文件中未找到有效的订阅链接")
                         continue
+                except FileNotFoundError:
+                    print(f"❌ 文件不存在: {file_path}")
+                    continue
                 except Exception as e:
                     print(f"❌ 读取文件失败: {e}")
                     continue
@@ -190,9 +196,7 @@ def interactive_output_filename():
     print("="*50)
 
     # 使用东八区时间生成默认文件名
-    beijing_tz = timezone(timedelta(hours=8))
-    beijing_time = datetime.now(beijing_tz)
-    default_filename = f"config_{beijing_time.strftime('%Y%m%d_%H%M%S')}.yaml"
+    default_filename = datetime.now(BEIJING).strftime(_DEFAULT_OUTPUT_FMT)
 
     print(f"\n默认文件名: {default_filename}")
     custom = input("使用自定义文件名? [y/N]: ").strip().lower()
@@ -255,6 +259,19 @@ def interactive_port_mapping():
         return False, 42001
 
 
+def _flush_progress(buf):
+    """
+    将缓冲的进度行一次性写入标准输出并清空缓冲区
+
+    Args:
+        buf (list): 待输出的行
+    """
+    if buf:
+        sys.stdout.write("\n".join(buf) + "\n")
+        sys.stdout.flush()
+        buf.clear()
+
+
 def print_banner():
     """打印欢迎横幅"""
     banner = """
@@ -365,9 +382,7 @@ def main():
 
         # 生成默认输出文件名(如果未提供)
         if not args.output:
-            beijing_tz = timezone(timedelta(hours=8))
-            beijing_time = datetime.now(beijing_tz)
-            output_path = f"config_{beijing_time.strftime('%Y%m%d_%H%M%S')}.yaml"
+            output_path = datetime.now(BEIJING).strftime(_DEFAULT_OUTPUT_FMT)
         else:
             output_path = args.output
 
@@ -378,25 +393,30 @@ def main():
 
     # ==================== 处理订阅文件 ====================
     if args.subs_file:
-        if not os.path.exists(args.subs_file):
-            logger.error(f"订阅文件未找到: {args.subs_file}")
-            sys.exit(1)
-
         try:
             with open(args.subs_file, 'r', encoding='utf-8') as f:
-                file_subs = [line.strip() for line in f if line.strip() and line.strip().startswith('http')]
+                file_subs = [s for line in f if (s := line.strip()) and s.startswith(_HTTP)]
             subscriptions.extend(file_subs)
             logger.info(f"从文件 '{args.subs_file}' 读取了 {len(file_subs)} 个订阅链接")
+        except FileNotFoundError:
+            logger.error(f"订阅文件未找到: {args.subs_file}")
+            sys.exit(1)
         except Exception as e:
             logger.error(f"读取订阅文件失败: {e}")
             sys.exit(1)
 
-    # ==================== 验证模板文件 ====================
-    if template_path and not os.path.exists(template_path):
-        logger.error(f"模板文件未找到: {template_path}")
-        sys.exit(1)
+    # ==================== 订阅链接去重 ====================
+    # 保持原有顺序,避免同一订阅被重复请求和解析
+    unique_subscriptions = list(dict.fromkeys(subscriptions))
+    if len(unique_subscriptions) < len(subscriptions):
+        logger.info("已移除 %d 个重复的订阅链接", len(subscriptions) - len(unique_subscriptions))
+    subscriptions = unique_subscriptions
 
     # ==================== 开始生成配置 ====================
+    # 延迟导入: 交互提示与 --help 阶段无需加载 yaml/requests 及节点解析器
+    from clash_config_generator.config_generator import ClashConfigGenerator
+    from clash_config_generator.subscription import SubscriptionManager
+
     try:
         print("\n" + "="*50)
         print("⚙️  正在生成配置...")
@@ -405,7 +425,10 @@ def main():
         # 1. 初始化配置生成器
         if template_path:
             logger.info(f"使用模板 '{template_path}' 初始化...")
-            config_generator = ClashConfigGenerator(template_path=template_path)
+            try:
+                config_generator = ClashConfigGenerator(template_path=template_path)
+            except FileNotFoundError:
+                sys.exit(1)
         else:
             logger.warning("未提供模板文件,将生成基础配置")
             # 这里可以创建一个最小化的默认配置
@@ -416,16 +439,23 @@ def main():
         if subscriptions:
             logger.info(f"找到了 {len(subscriptions)} 个订阅链接，正在获取节点...")
             sub_manager = SubscriptionManager()
-            all_proxies = []
+            fetched_lists = []
 
+            # 上一个订阅的结果与下一个订阅的进度合并为一次写入
+            progress_buf = []
             for i, url in enumerate(subscriptions, 1):
-                print(f"\n[{i}/{len(subscriptions)}] 正在获取订阅: {url[:50]}...")
+                progress_buf.append(f"\n[{i}/{len(subscriptions)}] 正在获取订阅: {url[:50]}...")
+                _flush_progress(progress_buf)
                 proxies = sub_manager.fetch_and_parse(url)
                 if proxies:
-                    all_proxies.extend(proxies)
-                    print(f"  ✅ 成功获取 {len(proxies)} 个节点")
+                    fetched_lists.append(proxies)
+                    progress_buf.append(f"  ✅ 成功获取 {len(proxies)} 个节点")
                 else:
-                    print(f"  ⚠️  未能获取节点")
+                    progress_buf.append(f"  ⚠️  未能获取节点")
+            _flush_progress(progress_buf)
+
+            # 所有订阅获取完成后一次性展平,避免逐个 extend 反复扩容
+            all_proxies = list(itertools.chain.from_iterable(fetched_lists))
 
             if all_proxies:
                 logger.info(f"总共获取 {len(all_proxies)} 个节点，正在添加到配置中...")
@@ -435,9 +465,7 @@ def main():
                 if is_interactive and enable_port_mapping:
                     logger.info(f"启用端口映射,起始端口: {start_port}")
                     # 为所有节点生成端口映射
-                    node_port_mappings = {}
-                    for i, proxy in enumerate(all_proxies):
-                        node_port_mappings[proxy['name']] = start_port + i
+                    node_port_mappings = {proxy['name']: start_port + i for i, proxy in enumerate(all_proxies)}
                     config_generator.generate_port_mappings(node_port_mappings)
                     print(f"\n✅ 已为 {len(all_proxies)} 个节点生成端口映射 (端口范围: {start_port}-{start_port + len(all_proxies) - 1})")
             else:
@@ -451,15 +479,13 @@ def main():
 
         if success:
             # 输出统计信息
-            print("\n" + "="*50)
-            print("🎉 配置生成成功!")
-            print("="*50)
-            print(f"✓ 模板: {template_path or '(无)'}")
+            summary = ["\n" + "="*50, "🎉 配置生成成功!", "="*50, f"✓ 模板: {template_path or '(无)'}"]
             if subscriptions:
-                print(f"✓ 订阅链接: {len(subscriptions)} 个")
-                print(f"✓ 总计节点: {len(config_generator.config.get('proxies', []))} 个")
-            print(f"✓ 输出文件: {os.path.abspath(output_path)}")
-            print("="*50 + "\n")
+                summary.append(f"✓ 订阅链接: {len(subscriptions)} 个")
+                summary.append(f"✓ 总计节点: {len(config_generator.config.get('proxies', []))} 个")
+            summary.append(f"✓ 输出文件: {os.path.abspath(output_path)}")
+            summary.append("="*50 + "\n")
+            _flush_progress(summary)
         else:
             logger.error("生成配置文件时遇到错误。")
             sys.exit(1)
@@ -2,10 +2,16 @@
 # -*- coding: utf-8 -*-
 
 import streamlit as st
+import pandas as pd
+import collections
+import concurrent.futures
 import logging
 import os
 import glob
+import hashlib
+import itertools
 import re
+import time
 import yaml
 from datetime import datetime, timezone, timedelta
 from urllib.parse import urlparse
@@ -14,6 +20,7 @@ from urllib.parse import urlparse
 from clash_config_generator.config_generator import ClashConfigGenerator
 from clash_config_generator.subscription import SubscriptionManager
 from clash_config_generator.node_parser import parse_proxy
+from clash_config_generator.utils import SafeLoader
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -27,11 +34,21 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# 已加载订阅的复用时长（秒），超过后再次点击「加载节点」会重新获取
+SUBSCRIPTION_TTL = 600
+
+# 东八区（北京时间），用于默认输出文件名
+BEIJING = timezone(timedelta(hours=8))
+
+# 订阅源名称中的非字母数字字符，用于生成组件 key
+_SLUG_RE = re.compile(r'[^a-zA-Z0-9]')
+
 # --- Session State Initialization ---
 states = {
     'subscription_urls': "",
     'selected_template': None,
     'custom_template_content': None,
+    'custom_template_digest': None,
     'nodes_loaded': False,
     'all_proxies': [],
     'proxies_by_source': {},
@@ -40,34 +57,150 @@ states = {
     'start_mapping_port': 42001,
     'source_all_selected': {},
     'port_mapping_confirmed': False,
+    'node_editor_rev': 0,
+    'node_tables': {},
+    'loaded_subscription_urls': {},
+    'force_refresh_subscriptions': False,
+    'generated_config': None,
+    'enabled_count': 0,
+    'node_sources': {},
+    'source_enabled_counts': {},
+    'expander_titles': {},
 }
 for key, value in states.items():
-    if key not in st.session_state:
-        st.session_state[key] = value
+    st.session_state.setdefault(key, value)
+
+@st.cache_data(show_spinner=False)
+def get_template_files(dir_mtime_ns):
+    """
+    获取项目根目录下的所有YAML模板文件。
+
+    以目录的 mtime 作为缓存键，目录内容变化时自动重新扫描。
+    """
+    return sorted(glob.glob("*.yaml"))
+
+def _slugify(source):
+    """将订阅源名称转换为可用作组件 key 的字符串。"""
+    return _SLUG_RE.sub('_', source)
 
-def get_template_files():
-    """获取项目根目录下的所有YAML模板文件。"""
-    return glob.glob("*.yaml")
+def check_enabled_count():
+    """
+    调试用：设置环境变量 CLASH_GUI_DEBUG 时校验维护的 enabled_count 与实际启用节点数一致
+    """
+    if os.environ.get('CLASH_GUI_DEBUG'):
+        actual = sum(1 for m in st.session_state.node_mappings.values() if m.get('enabled'))
+        assert st.session_state.enabled_count == actual, \
+            f"enabled_count 不一致: 维护值 {st.session_state.enabled_count}, 实际 {actual}"
+        node_mappings = st.session_state.node_mappings
+        for source, proxies in st.session_state.proxies_by_source.items():
+            actual = sum(1 for p in proxies if node_mappings.get(p['name'], {}).get('enabled'))
+            maintained = st.session_state.source_enabled_counts.get(source, 0)
+            assert maintained == actual, f"来源 '{source}' 启用数不一致: 维护值 {maintained}, 实际 {actual}"
+
+def format_expander_title(source, proxies):
+    """生成订阅源折叠面板的标题。"""
+    return f"源: {source} ({len(proxies)}个节点)"
+
+def bump_node_editor_rev():
+    """
+    在表格之外修改 node_mappings 后调用，使节点表格以新的 key 和新的数据重建，
+    丢弃表格组件内部残留的编辑记录，始终以 node_mappings 为准渲染。
+    """
+    st.session_state.node_editor_rev += 1
+    st.session_state.node_tables = {}
+
+def clear_generated_config():
+    """生成配置所依赖的输入发生变化时丢弃已生成的结果，避免下载按钮提供过期的配置。"""
+    st.session_state.generated_config = None
+
+def on_port_mapping_toggle():
+    """切换端口映射开关：表格关闭期间其编辑记录会被清除，重新显示时须按 node_mappings 重建。"""
+    bump_node_editor_rev()
+    clear_generated_config()
 
 def update_node_ports():
     """当起始端口改变时，更新所有节点的端口映射。"""
     start_port = st.session_state.start_mapping_port
     if 'all_proxies' in st.session_state and 'node_mappings' in st.session_state:
+        # 绑定为局部变量，避免循环内反复经过 session_state 代理取值
+        node_mappings = st.session_state.node_mappings
         for i, proxy in enumerate(st.session_state.all_proxies):
-            if proxy['name'] in st.session_state.node_mappings:
-                st.session_state.node_mappings[proxy['name']]['port'] = start_port + i
+            mapping = node_mappings.get(proxy['name'])
+            if mapping is not None:
+                mapping['port'] = start_port + i
+        bump_node_editor_rev()
+        clear_generated_config()
+
+def set_node_enabled(name, mapping, enabled):
+    """
+    修改单个节点的启用状态，并同步维护总启用数及该节点所在各来源的启用数
+
+    同名节点可能同时出现在多个来源中，node_sources 记录其所在的全部来源。
+    """
+    if mapping['enabled'] == enabled:
+        return
+    mapping['enabled'] = enabled
+    delta = 1 if enabled else -1
+    st.session_state.enabled_count += delta
+    source_enabled_counts = st.session_state.source_enabled_counts
+    for source in st.session_state.node_sources.get(name, ()):
+        source_enabled_counts[source] = source_enabled_counts.get(source, 0) + delta
 
 def toggle_all_nodes(source_key, proxies):
     """切换一个源的所有节点的启用状态。"""
     is_checked = st.session_state[f"all_{source_key}"]
-    for p in proxies:
-        node_name = p['name']
-        if node_name in st.session_state.node_mappings:
-            # 更新 node_mappings 中的状态
-            st.session_state.node_mappings[node_name]['enabled'] = is_checked
-            # 同步更新单个checkbox的session state key
-            checkbox_key = f"enable_{node_name}"
-            st.session_state[checkbox_key] = is_checked
+    node_mappings = st.session_state.node_mappings
+    changed = [p['name'] for p in proxies
+               if p['name'] in node_mappings and node_mappings[p['name']]['enabled'] != is_checked]
+    if not changed:
+        # 状态未变化，无需写入，也无需重建节点表格
+        return
+    for name in changed:
+        set_node_enabled(name, node_mappings[name], is_checked)
+    bump_node_editor_rev()
+    clear_generated_config()
+
+def apply_node_edits(editor_key, node_names):
+    """
+    节点表格的 on_change 回调，只把发生变化的行写回 node_mappings
+
+    表格的输入数据保存在 node_tables 中并原样复用，表格自身的编辑记录已与写回的值一致，
+    因此不重建表格；仅当编辑的节点同时出现在其他来源的表格中时才更新 key，
+    让这些表格以新的 node_mappings 重新渲染。
+
+    Args:
+        editor_key (str): data_editor 组件的 key
+        node_names (list): 表格各行对应的节点名称
+    """
+    edited_rows = st.session_state[editor_key].get('edited_rows', {})
+    if not edited_rows:
+        return
+    clear_generated_config()
+
+    # edited_rows 累积自表格创建以来的全部修改，只有值确实变化时才视为新的修改
+    port_changed = False
+    edited_names = set()
+    for row, changes in edited_rows.items():
+        name = node_names[int(row)]
+        mapping = st.session_state.node_mappings.get(name)
+        if mapping is None:
+            continue
+        edited_names.add(name)
+        if 'enabled' in changes:
+            set_node_enabled(name, mapping, bool(changes['enabled']))
+        if changes.get('port') is not None:
+            port = int(changes['port'])
+            if port != mapping['port']:
+                mapping['port'] = port
+                port_changed = True
+
+    # 修改端口时自动取消确认状态
+    if port_changed:
+        on_port_change()
+
+    node_sources = st.session_state.node_sources
+    if any(len(node_sources.get(name, ())) > 1 for name in edited_names):
+        bump_node_editor_rev()
 
 def validate_port_unique(node_name, new_port):
     """
@@ -110,19 +243,7 @@ def validate_and_confirm_ports():
         logger.info("用户取消了端口映射确认")
         return
 
-    # 用户勾选，先同步所有端口输入框的值到 node_mappings
-    logger.info("开始同步端口值到 node_mappings...")
-    for node_name, mapping in st.session_state.node_mappings.items():
-        if mapping.get('enabled'):
-            port_input_key = f"port_{node_name}"
-            if port_input_key in st.session_state:
-                # 获取用户输入的端口值
-                new_port = st.session_state[port_input_key]
-                # 同步到 node_mappings
-                st.session_state.node_mappings[node_name]['port'] = new_port
-                logger.debug(f"节点 '{node_name}' 端口同步: {mapping.get('port')} -> {new_port}")
-
-    # 开始验证
+    # 开始验证（节点表格的修改已在 apply_node_edits 中实时写回 node_mappings）
     has_conflicts, conflicts = check_port_conflicts()
 
     if has_conflicts:
@@ -140,7 +261,7 @@ def validate_and_confirm_ports():
         st.rerun()
     else:
         # 无冲突，保持勾选
-        enabled_count = sum(1 for m in st.session_state.node_mappings.values() if m.get('enabled'))
+        enabled_count = st.session_state.enabled_count
         st.toast(f"✅ 端口验证通过！所有 {enabled_count} 个端口均无冲突")
         logger.info(f"端口映射确认成功: 所有 {enabled_count} 个端口均无冲突")
 
@@ -153,19 +274,35 @@ def auto_fix_port_conflicts():
         return
 
     start_port = st.session_state.get('start_mapping_port', 42001)
-    enabled_nodes = [(name, mapping) for name, mapping in st.session_state.node_mappings.items() if mapping.get('enabled')]
+    enabled_nodes = [mapping for mapping in st.session_state.node_mappings.values() if mapping.get('enabled')]
 
     # 按原有端口排序，保持相对顺序
-    enabled_nodes.sort(key=lambda x: x[1].get('port', 0))
+    enabled_nodes.sort(key=lambda m: m.get('port', 0))
 
     # 重新分配端口
-    current_port = start_port
-    for name, mapping in enabled_nodes:
-        st.session_state.node_mappings[name]['port'] = current_port
-        current_port += 1
+    for port, mapping in enumerate(enabled_nodes, start_port):
+        mapping['port'] = port
+    bump_node_editor_rev()
+    clear_generated_config()
 
     logger.info(f"自动修正端口冲突完成，共分配 {len(enabled_nodes)} 个端口")
 
+def _any_port_conflict():
+    """
+    快速判断已启用节点之间是否存在端口冲突（遇到第一个重复端口即返回）
+
+    Returns:
+        bool: 是否有冲突
+    """
+    seen = set()
+    for mapping in st.session_state.node_mappings.values():
+        if mapping.get('enabled'):
+            port = mapping.get('port')
+            if port in seen:
+                return True
+            seen.add(port)
+    return False
+
 def check_port_conflicts():
     """
     检查当前所有启用节点的端口冲突
@@ -174,15 +311,16 @@ def check_port_conflicts():
         tuple: (是否有冲突, 冲突列表)
         冲突列表格式: [(端口号, [节点名1, 节点名2, ...])]
     """
-    port_usage = {}
-    for name, mapping in st.session_state.node_mappings.items():
-        if mapping.get('enabled'):
-            port = mapping.get('port')
-            if port not in port_usage:
-                port_usage[port] = []
+    enabled_ports = [(name, mapping.get('port')) for name, mapping in st.session_state.node_mappings.items() if mapping.get('enabled')]
+    port_counts = collections.Counter(port for _, port in enabled_ports)
+
+    # 只为重复的端口分组收集节点名，不再为每个端口各建一个列表
+    port_usage = {port: [] for port, count in port_counts.items() if count > 1}
+    for name, port in enabled_ports:
+        if port in port_usage:
             port_usage[port].append(name)
 
-    conflicts = [(port, nodes) for port, nodes in port_usage.items() if len(nodes) > 1]
+    conflicts = list(port_usage.items())
     return len(conflicts) > 0, conflicts
 
 def add_multiple_nodes():
@@ -194,22 +332,18 @@ def add_multiple_nodes():
         st.toast("⚠️ 请输入至少一个节点URI。" )
         return
 
-    uris_list = [uri.strip() for uri in uris.splitlines() if uri.strip()]
+    uris_list = [s for uri in uris.splitlines() if (s := uri.strip())]
     
-    successful_count = 0
     failed_count = 0
     
     manual_source_name = "手动添加"
 
-    # 确保核心 state keys 存在
-    if 'all_proxies' not in st.session_state:
-        st.session_state.all_proxies = []
-    if 'proxies_by_source' not in st.session_state:
-        st.session_state.proxies_by_source = {}
-    if manual_source_name not in st.session_state.proxies_by_source:
-        st.session_state.proxies_by_source[manual_source_name] = []
-    if 'node_mappings' not in st.session_state:
-        st.session_state.node_mappings = {}
+    # 核心 state keys 已在会话初始化时设置默认值，这里只需确保手动来源存在
+    manual_proxies = st.session_state.proxies_by_source.setdefault(manual_source_name, [])
+
+    all_proxies = st.session_state.all_proxies
+    existing_names = {p['name'] for p in all_proxies}
+    new_nodes = []
 
     with st.spinner(f"正在解析和添加 {len(uris_list)} 个节点..."):
         for uri in uris_list:
@@ -217,30 +351,39 @@ def add_multiple_nodes():
                 node = parse_proxy(uri)
                 if node:
                     # 检查节点是否已存在
-                    if any(p['name'] == node['name'] for p in st.session_state.all_proxies):
-                        logger.warning(f"节点 '{node['name']}' 已存在，跳过添加。" )
+                    if node['name'] in existing_names:
+                        logger.warning("节点 '%s' 已存在，跳过添加。", node['name'])
                         failed_count += 1
                         continue
 
                     node['_source'] = manual_source_name
-                    
-                    st.session_state.all_proxies.append(node)
-                    st.session_state.proxies_by_source[manual_source_name].append(node)
-                    
-                    # 为新节点添加映射
-                    port = st.session_state.start_mapping_port + len(st.session_state.all_proxies) - 1
-                    st.session_state.node_mappings[node['name']] = {"enabled": False, "port": port}
-                    
-                    successful_count += 1
+                    new_nodes.append(node)
+                    existing_names.add(node['name'])
                 else:
-                    logger.error(f"无法解析URI: {uri}")
+                    logger.error("无法解析URI: %s", uri)
                     failed_count += 1
             except Exception as e:
-                logger.error(f"处理URI时出错 '{uri}': {e}")
+                logger.error("处理URI时出错 '%s': %s", uri, e)
                 failed_count += 1
 
+    # 解析完成后一次性写入会话状态，为新节点按顺序分配端口
+    first_port = st.session_state.start_mapping_port + len(all_proxies)
+    all_proxies.extend(new_nodes)
+    manual_proxies.extend(new_nodes)
+    node_mappings = st.session_state.node_mappings
+    node_sources = st.session_state.node_sources
+    for port, node in enumerate(new_nodes, first_port):
+        node_mappings[node['name']] = {"enabled": False, "port": port}
+        node_sources[node['name']] = [manual_source_name]
+    successful_count = len(new_nodes)
+
     # 显示结果
     if successful_count > 0:
+        st.session_state.expander_titles[manual_source_name] = format_expander_title(
+            manual_source_name, manual_proxies
+        )
+        bump_node_editor_rev()
+        clear_generated_config()
         st.toast(f"✅ 成功添加 {successful_count} 个节点。" )
         st.session_state.force_collapse = True
     if failed_count > 0:
@@ -250,64 +393,125 @@ def add_multiple_nodes():
     if successful_count > 0:
         st.session_state.multiple_node_uris = ""
 
+@st.cache_resource
+def get_sub_manager():
+    """在所有会话和重跑之间共享同一个 SubscriptionManager（及其 NodeParser）实例。"""
+    return SubscriptionManager()
+
+def _safe_fetch(sub_manager, url):
+    """在工作线程中获取并解析单个订阅，出错时返回空列表，避免影响其他订阅。"""
+    try:
+        return sub_manager.fetch_and_parse(url)
+    except Exception as e:
+        logger.error("获取订阅 '%s' 时出错: %s", url, e)
+        return []
+
 def callback_load_nodes():
     """
     Callback function to load nodes from subscription URLs.
     """
     with st.spinner("正在从订阅链接加载节点..."):
-        # 先筛选出所有手动添加的节点并保留
+        # 先保留手动添加的节点来源
         manual_source_name = "手动添加"
-        existing_proxies = st.session_state.get('all_proxies', [])
-        all_proxies = [p for p in existing_proxies if p.get('_source') == manual_source_name]
-        
         existing_sources = st.session_state.get('proxies_by_source', {})
         proxies_by_source = {k: v for k, v in existing_sources.items() if k == manual_source_name}
 
-        sub_manager = SubscriptionManager()
+        # 上次加载成功且未过期的订阅: url -> (来源名称, 加载时间, 解析出的节点)
+        # 按 URL 保存节点，同一主机下的多个订阅不会互相覆盖缓存
+        # 勾选「强制刷新订阅」时忽略缓存，全部重新获取
+        now = time.time()
+        if st.session_state.force_refresh_subscriptions:
+            loaded_urls = {}
+        else:
+            loaded_urls = {
+                url: entry for url, entry in st.session_state.get('loaded_subscription_urls', {}).items()
+                if now - entry[1] < SUBSCRIPTION_TTL
+            }
+        new_loaded_urls = {}
+
+        sub_manager = get_sub_manager()
 
         if st.session_state.subscription_urls:
-            urls = [url.strip() for url in st.session_state.subscription_urls.split('\n') if url.strip()]
+            urls = dict.fromkeys(s for url in st.session_state.subscription_urls.splitlines() if (s := url.strip()))
+
+            # 未加载过或已过期的订阅并发获取，总耗时取决于最慢的一个而非所有订阅之和
+            to_fetch = [url for url in urls if url not in loaded_urls]
+            if to_fetch:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=min(16, len(to_fetch))) as executor:
+                    for url, proxies in zip(to_fetch, executor.map(_safe_fetch, itertools.repeat(sub_manager), to_fetch)):
+                        if proxies:
+                            loaded_urls[url] = (urlparse(url).netloc, now, proxies)
+
             for url in urls:
-                proxies = sub_manager.fetch_and_parse(url)
-                if proxies:
-                    source_name = urlparse(url).netloc
+                entry = loaded_urls.get(url)
+                if entry:
+                    # 有效期内已加载的订阅直接复用其节点，不再重复请求
+                    source_name, _, proxies = entry
                     # Always replace (not extend) to avoid accumulating old proxies
                     proxies_by_source[source_name] = proxies
+                    new_loaded_urls[url] = entry
 
         # Rebuild all_proxies from scratch by combining all sources
         # This ensures no accumulation when reloading
-        for source_proxies in proxies_by_source.values():
-            all_proxies.extend(source_proxies)
-        
+        # 多个订阅常含同名节点，按名称去重并保留首次出现的节点（与生成配置时的取舍一致）
+        unique_proxies = {}
+        for proxy in itertools.chain.from_iterable(proxies_by_source.values()):
+            unique_proxies.setdefault(proxy['name'], proxy)
+        all_proxies = list(unique_proxies.values())
+
         st.session_state.all_proxies = all_proxies
+        st.session_state.loaded_subscription_urls = new_loaded_urls
+        st.session_state.expander_titles = {
+            source: format_expander_title(source, source_proxies) for source, source_proxies in proxies_by_source.items()
+        }
         st.session_state.proxies_by_source = proxies_by_source
         st.session_state.nodes_loaded = True
         
-        old_mappings = st.session_state.get('node_mappings', {})
-        new_mappings = {}
-        port = st.session_state.start_mapping_port
-        for proxy in all_proxies:
-            proxy_name = proxy['name']
-            if proxy_name in old_mappings:
-                new_mappings[proxy_name] = {
-                    "enabled": old_mappings[proxy_name].get('enabled', False),
-                    "port": port
-                }
+        # 按 all_proxies 的顺序重建映射（监听器按映射顺序编号），复用已有节点的映射对象
+        # 以保留启用状态，只为新节点创建映射；已不存在的节点随之丢弃
+        old_mappings = st.session_state.node_mappings
+        node_mappings = {}
+        start_port = st.session_state.start_mapping_port
+        for port, proxy in enumerate(all_proxies, start_port):
+            mapping = old_mappings.get(proxy['name'])
+            if mapping is None:
+                mapping = {"enabled": False, "port": port}
             else:
-                new_mappings[proxy_name] = {"enabled": False, "port": port}
-            port += 1
-        st.session_state.node_mappings = new_mappings
+                mapping['port'] = port
+            node_mappings[proxy['name']] = mapping
+        st.session_state.node_mappings = node_mappings
+        st.session_state.enabled_count = sum(1 for m in node_mappings.values() if m.get('enabled'))
+
+        # 节点名称 -> 所在的全部来源，以及各来源的启用数，供全选状态直接读取
+        node_sources = {}
+        source_enabled_counts = {}
+        for source, source_proxies in proxies_by_source.items():
+            enabled = 0
+            for proxy in source_proxies:
+                node_sources.setdefault(proxy['name'], []).append(source)
+                enabled += node_mappings[proxy['name']]['enabled']
+            source_enabled_counts[source] = enabled
+        st.session_state.node_sources = node_sources
+        st.session_state.source_enabled_counts = source_enabled_counts
+        bump_node_editor_rev()
+        clear_generated_config()
         st.session_state.force_collapse = True
 
+@st.cache_data(max_entries=2048, show_spinner=False)
+def _dump_proxy_yaml(details):
+    """将节点详情序列化为YAML字符串（按节点内容缓存，避免每次重跑都重新dump）。"""
+    return yaml.dump(details, allow_unicode=True, sort_keys=False)
+
 def display_proxy_details(proxy):
     """Displays the details of a proxy node in a YAML format, excluding internal keys."""
-    details_to_show = proxy.copy()
-    details_to_show.pop('_source', None) # Safely remove the internal key
-    st.code(yaml.dump(details_to_show, allow_unicode=True, sort_keys=False), language='yaml')
+    details_to_show = {k: v for k, v in proxy.items() if k != '_source'}
+    st.code(_dump_proxy_yaml(details_to_show), language='yaml')
 
 def main():
     """Streamlit应用主函数"""
     
+    check_enabled_count()
+
     st.title("Create Clash Yaml")
     st.markdown("一个基于模板的、现代化的Clash配置文件生成工具。" )
 
@@ -319,7 +523,7 @@ def main():
         st.header("📥 输入源")
         with st.container(border=True):
             st.subheader("① 选择或上传模板")
-            template_files = get_template_files()
+            template_files = get_template_files(os.stat('.').st_mtime_ns)
             if not template_files and not st.session_state.custom_template_content:
                 st.error("错误：项目根目录下未找到任何.yaml模板文件。请添加一个或上传一个模板。" )
 
@@ -327,11 +531,17 @@ def main():
                 preferred_template = next((t for t in template_files if 'qishiyu' in t), template_files[0])
                 st.session_state.selected_template = preferred_template
 
-            st.selectbox("选择一个预设模板", options=template_files, key='selected_template')
+            st.selectbox("选择一个预设模板", options=template_files, key='selected_template', on_change=clear_generated_config)
             
             uploaded_file = st.file_uploader("或上传自定义模板", type=['yaml', 'yml'])
             if uploaded_file:
-                st.session_state.custom_template_content = uploaded_file.getvalue().decode('utf-8')
+                # 仅在上传内容变化时重新解码，摘要同时作为模板解析缓存的键
+                data = uploaded_file.getvalue()
+                digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+                if st.session_state.custom_template_digest != digest:
+                    st.session_state.custom_template_content = data.decode('utf-8')
+                    st.session_state.custom_template_digest = digest
+                    clear_generated_config()
                 st.success(f"已上传模板 '{uploaded_file.name}'")
 
         with st.container(border=True):
@@ -339,6 +549,8 @@ def main():
             st.text_area("每个链接占一行", key="subscription_urls", height=150)
 
         st.button("加载节点", type="primary", use_container_width=True, on_click=callback_load_nodes)
+        st.checkbox("强制刷新订阅", key='force_refresh_subscriptions')
+        st.caption(f"已加载的订阅在 {SUBSCRIPTION_TTL // 60} 分钟内再次加载时复用缓存；如需获取最新节点，请勾选「强制刷新订阅」。")
 
         with st.container(border=True):
             st.subheader("③ 添加手动节点")
@@ -355,7 +567,7 @@ def main():
         st.header("🚀 设置与生成")
         with st.container(border=True):
             st.subheader("端口映射")
-            st.checkbox("启用多端口映射", key='enable_port_mapping')
+            st.checkbox("启用多端口映射", key='enable_port_mapping', on_change=on_port_mapping_toggle)
             if st.session_state.enable_port_mapping:
                 st.number_input(
                     "起始端口",
@@ -374,15 +586,17 @@ def main():
                     help="勾选以验证所有端口配置，验证通过后才能生成配置文件"
                 )
 
-                # 端口冲突检查和自动修复
-                has_conflicts, conflicts = check_port_conflicts()
-                if has_conflicts:
+                # 端口冲突检查和自动修复（无冲突时只做快速检查，不构建冲突分组）
+                if _any_port_conflict():
+                    _, conflicts = check_port_conflicts()
                     st.warning(f"⚠️ 检测到 {len(conflicts)} 个端口冲突")
                     with st.expander("查看冲突详情", expanded=True):
+                        # 所有冲突合并为一个纯文本元素发送；节点名常含 * _ [ 等字符，不能按 markdown 渲染
+                        conflict_lines = []
                         for port, nodes in conflicts:
-                            st.error(f"**端口 {port}** 被以下节点共用:")
-                            for node in nodes:
-                                st.text(f"  • {node[:40]}{'...' if len(node) > 40 else ''}")
+                            conflict_lines.append(f"端口 {port} 被以下节点共用:")
+                            conflict_lines.extend(f"  • {node[:40]}{'...' if len(node) > 40 else ''}" for node in nodes)
+                        st.text("\n".join(conflict_lines))
 
                     # 自动修复按钮
                     if st.button("🔧 自动修复端口冲突", use_container_width=True, type="secondary"):
@@ -391,7 +605,7 @@ def main():
                         st.rerun()
                 else:
                     # 检查是否已确认端口映射
-                    enabled_count = sum(1 for m in st.session_state.node_mappings.values() if m.get('enabled'))
+                    enabled_count = st.session_state.enabled_count
                     if enabled_count > 0:
                         if st.session_state.get('port_mapping_confirmed', False):
                             # 已确认且无冲突
@@ -402,10 +616,7 @@ def main():
 
         with st.container(border=True):
             st.subheader("生成配置文件")
-            # 使用东八区（北京时间）
-            beijing_tz = timezone(timedelta(hours=8))
-            beijing_time = datetime.now(beijing_tz)
-            output_filename = st.text_input("输出文件名", value=f"config_{beijing_time.strftime('%Y%m%d_%H%M')}.yaml")
+            output_filename = st.text_input("输出文件名", value=datetime.now(BEIJING).strftime("config_%Y%m%d_%H%M.yaml"), on_change=clear_generated_config)
 
             if st.button("生成配置文件", type="primary", use_container_width=True):
                 template_path = st.session_state.selected_template
@@ -424,6 +635,14 @@ def main():
                         # 未启用端口映射，直接生成
                         generate_config_file(template_path, output_filename)
 
+            # 生成结果保存在 session_state 中，重跑后下载按钮依然可用
+            generated_config = st.session_state.generated_config
+            if generated_config:
+                st.download_button("点击下载配置文件", generated_config['data'], generated_config['file_name'], 'text/yaml', use_container_width=True)
+                # 完整配置可能很大，只在用户勾选时才渲染预览并发送到浏览器
+                if st.checkbox("显示配置预览", key='show_config_preview'):
+                    st.code(generated_config['data'].decode('utf-8'), language='yaml')
+
     # --- Column 2: Node Configuration ---
     with col2:
         st.header("⚙️ 节点列表")
@@ -431,10 +650,9 @@ def main():
             st.info("请从左侧加载节点以查看列表。")
         else:
             total_nodes = len(st.session_state.all_proxies)
-            mapped_nodes = sum(1 for m in st.session_state.node_mappings.values() if m.get('enabled'))
             c1, c2 = st.columns(2)
             c1.metric("总节点数", f"{total_nodes} 个")
-            c2.metric("已映射端口", f"{mapped_nodes} 个" if st.session_state.enable_port_mapping else "-")
+            c2.metric("已映射端口", f"{st.session_state.enabled_count} 个" if st.session_state.enable_port_mapping else "-")
 
             st.info("点击订阅源可展开/折叠节点列表：")
 
@@ -446,20 +664,33 @@ def main():
                 if not proxies:
                     continue
 
-                expander_title = f"源: {source} ({len(proxies)}个节点)"
+                expander_title = st.session_state.expander_titles.get(source) or format_expander_title(source, proxies)
                 with st.expander(expander_title, expanded=default_expanded_state):
-                    source_key = re.sub(r'[^a-zA-Z0-9]', '_', source)
+                    source_key = _slugify(source)
 
                     if st.session_state.enable_port_mapping:
+                        node_mappings = st.session_state.node_mappings
+                        # 表格数据只在 node_editor_rev 变化时重建，其余重跑传入同一个 DataFrame，
+                        # 表格组件的标识保持不变，不会因数据变化而重新挂载
+                        node_table_entry = st.session_state.node_tables.get(source_key)
+                        if node_table_entry is None:
+                            node_names = [p['name'] for p in proxies if p['name'] in node_mappings]
+                            node_table_entry = st.session_state.node_tables[source_key] = (node_names, pd.DataFrame({
+                                'enabled': [node_mappings[name]['enabled'] for name in node_names],
+                                'name': node_names,
+                                'port': [node_mappings[name]['port'] for name in node_names],
+                            }))
+                        node_names, node_table = node_table_entry
+
                         # 在渲染全选checkbox之前，根据所有单个节点状态初始化全选checkbox的state
                         all_checkbox_key = f"all_{source_key}"
                         if all_checkbox_key not in st.session_state:
                             # 首次初始化为False
                             st.session_state[all_checkbox_key] = False
                         else:
-                            # 如果已存在，根据当前所有节点状态更新（在widget创建前更新是允许的）
-                            all_enabled = all(st.session_state.node_mappings.get(p['name'], {}).get('enabled', False) for p in proxies)
-                            st.session_state[all_checkbox_key] = all_enabled
+                            # 如果已存在，根据维护的本源启用数更新（在widget创建前更新是允许的）
+                            enabled_in_source = st.session_state.source_enabled_counts.get(source, 0)
+                            st.session_state[all_checkbox_key] = enabled_in_source == len(node_names)
 
                         st.checkbox(
                             "全选/取消全选",
@@ -469,58 +700,59 @@ def main():
                         )
                         st.markdown("---")
 
-                        for proxy in proxies:
-                            node_name = proxy['name']
-                            node_mapping = st.session_state.node_mappings.get(node_name)
-                            if not node_mapping:
-                                continue
-
-                            # 初始化checkbox的session state（如果不存在）
-                            checkbox_key = f"enable_{node_name}"
-                            if checkbox_key not in st.session_state:
-                                st.session_state[checkbox_key] = node_mapping["enabled"]
-
-                            c1, c2, c3 = st.columns([1, 5, 3])
-                            # 移除value参数，只使用key参数，避免Streamlit警告
-                            enabled = c1.checkbox(" ", key=checkbox_key, label_visibility="collapsed")
-
-                            # 检查状态是否改变
-                            if enabled != node_mapping['enabled']:
-                                # 更新 node_mappings
-                                st.session_state.node_mappings[node_name]['enabled'] = enabled
-                                st.rerun()
-
-                            with c2.expander(node_name):
-                                display_proxy_details(proxy)
-
-                            if enabled:
-                                # 端口输入框（修改端口时自动取消确认状态）
-                                c3.number_input(
-                                    "端口",
-                                    value=node_mapping["port"],
-                                    key=f"port_{node_name}",
-                                    label_visibility="collapsed",
-                                    min_value=1025,
-                                    max_value=65535,
-                                    on_change=on_port_change
-                                )
+                        # 单个表格承载该源所有节点的启用状态和端口，替代逐节点的复选框/输入框
+                        editor_key = f"editor_{source_key}_{st.session_state.node_editor_rev}"
+                        st.data_editor(
+                            node_table,
+                            key=editor_key,
+                            on_change=apply_node_edits,
+                            args=(editor_key, node_names),
+                            hide_index=True,
+                            use_container_width=True,
+                            disabled=['name'],
+                            column_config={
+                                'enabled': st.column_config.CheckboxColumn("启用"),
+                                'name': st.column_config.TextColumn("节点"),
+                                'port': st.column_config.NumberColumn("端口", min_value=1025, max_value=65535, step=1),
+                            }
+                        )
+
                     else:
-                        for proxy in proxies:
-                            with st.expander(proxy['name']):
-                                display_proxy_details(proxy)
+                        # 只读的节点名称列表：一个表格元素列出该源全部节点
+                        st.dataframe({'节点': [p['name'] for p in proxies]}, hide_index=True, use_container_width=True)
+
+                    # 展开器折叠时内容仍会被执行，因此只渲染选中节点的详情，而非为每个节点各建一个展开器
+                    with st.expander("查看节点详情"):
+                        proxies_by_name = {p['name']: p for p in proxies}
+                        selected_name = st.selectbox("选择节点", options=list(proxies_by_name), key=f"detail_{source_key}")
+                        if selected_name:
+                            display_proxy_details(proxies_by_name[selected_name])
+
+# 缓存为进程内所有会话共享，限制条目数，避免长期运行的服务不断累积旧模板
+@st.cache_resource(max_entries=8, show_spinner=False)
+def load_template_file(template_path, mtime):
+    """解析模板文件并缓存结果，模板文件修改后（mtime 变化）自动重新解析。"""
+    with open(template_path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def parse_template_content(digest, _content):
+    """解析上传的模板内容并按内容摘要缓存结果（_content 不参与缓存键的哈希）。"""
+    return yaml.load(_content, Loader=SafeLoader)
 
 def generate_config_file(template_path, output_filename):
     """生成配置文件的实际逻辑（提取为独立函数）"""
-    temp_template_path = None
     try:
         with st.spinner("正在生成配置..."):
-            if st.session_state.custom_template_content:
-                temp_template_path = "temp_template.yaml"
-                with open(temp_template_path, "w", encoding="utf-8") as f:
-                    f.write(st.session_state.custom_template_content)
-                template_path = temp_template_path
+            # 缓存中的模板为共享对象，ClashConfigGenerator 会对其深拷贝后再修改
+            content = st.session_state.custom_template_content
+            if content:
+                template = parse_template_content(st.session_state.custom_template_digest, content)
+                template_path = None
+            else:
+                template = load_template_file(template_path, os.path.getmtime(template_path))
 
-            config_generator = ClashConfigGenerator(template_path=template_path)
+            config_generator = ClashConfigGenerator(template_path=template_path, template_dict=template)
 
             # 将解析出的节点静态注入到 proxies 列表
             if st.session_state.all_proxies:
@@ -533,19 +765,14 @@ def generate_config_file(template_path, output_filename):
                     config_generator.generate_port_mappings(enabled_mappings)
 
             config_yaml = config_generator.generate_full_config()
+            # 只编码一次并保存字节，之后每次重跑渲染下载按钮时无需重新编码
+            st.session_state.generated_config = {'file_name': output_filename, 'data': config_yaml.encode('utf-8')}
             st.success("🎉 配置生成成功！")
-            st.download_button("点击下载配置文件", config_yaml, output_filename, 'text/yaml', use_container_width=True)
-
-            with st.expander("查看生成的配置预览", expanded=False):
-                st.code(config_yaml, language='yaml')
 
     except Exception as e:
+        st.session_state.generated_config = None
         logger.error("Failed to generate config file.", exc_info=True)
         st.error(f"生成配置时出错: {e}")
-    finally:
-        if temp_template_path and os.path.exists(temp_template_path):
-            os.remove(temp_template_path)
-            logger.info(f"已清理临时模板文件: {temp_template_path}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file